@@ -1,109 +1,324 @@
 #!/usr/bin/env python3
 
+import asyncio
 import subprocess
-import schedule
 import time
 import smtplib
 import logging
+import logging.handlers
 import json
+import re
 import os
-from datetime import datetime, timedelta
-from collections import defaultdict
+import select
+import signal
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from typing import Optional, Tuple
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 import requests  # For Slack notifications
-from influxdb_client import InfluxDBClient, Point, WritePrecision
-from influxdb_client.client.write_api import SYNCHRONOUS
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from influxdb_client import InfluxDBClient, WritePrecision
+from influxdb_client.client.write_api import WriteOptions
 from dotenv import load_dotenv
 
+# Optional: talk to systemd over DBus instead of spawning systemctl
+try:
+    from pystemd.dbuslib import DBus
+    from pystemd.systemd1 import Manager as SystemdManager, Unit as SystemdUnit
+except ImportError:
+    SystemdUnit = None
+
 load_dotenv()
 
 # Configure logging
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# File writes are buffered and only flushed in bulk, or right away for warnings and errors
+_log_file_handler = logging.handlers.RotatingFileHandler("service_doctor.log", maxBytes=10_000_000, backupCount=5)
+_log_file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+_log_memory_handler = logging.handlers.MemoryHandler(capacity=256, flushLevel=logging.WARNING, target=_log_file_handler)
+atexit.register(_log_memory_handler.flush)
+
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
+    format=LOG_FORMAT,
     handlers=[
-        logging.FileHandler("service_doctor.log"),
+        _log_memory_handler,
         logging.StreamHandler()
     ]
 )
 
-CONFIG = {}
+# Parsed configuration tree, built once by load_config. Channels are only
+# marked enabled when they also have the credentials they need, so the hot
+# path never has to validate settings again.
+@dataclass(frozen=True, slots=True)
+class EmailCfg:
+    enabled: bool
+    smtp_server: str
+    smtp_port: int
+    sender: str
+    receivers: Tuple[str, ...]
+    password: Optional[str]
+
+@dataclass(frozen=True, slots=True)
+class WebhookCfg:
+    enabled: bool
+    webhook_url: Optional[str]
+
+@dataclass(frozen=True, slots=True)
+class InfluxCfg:
+    enabled: bool
+    url: Optional[str]
+    token: Optional[str]
+    org: Optional[str]
+    bucket: Optional[str]
+
+@dataclass(frozen=True, slots=True)
+class AppCfg:
+    services: Tuple[str, ...]
+    scan_interval_minutes: float
+    watchdog_interval_minutes: float
+    alert_threshold: int
+    alert_window_hours: float
+    alert_window_seconds: float
+    email: EmailCfg
+    slack: WebhookCfg
+    teams: WebhookCfg
+    influx: InfluxCfg
+
+CONFIG: Optional[AppCfg] = None
 
 # Load configuration from file if exists, and override with environment variables
 def load_config():
+    global CONFIG
+    raw_config = {}
     config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "config.json")
     if os.path.exists(config_path):
         try:
             with open(config_path, 'r') as f:
-                user_config = json.load(f)
-                CONFIG.update(user_config)  # Replace or merge entire config
+                raw_config = json.load(f)
             logging.info(f"Loaded configuration from {config_path}")
         except Exception as e:
             logging.error(f"Failed to load configuration from {config_path}: {e}")
-    
-    influx_config = CONFIG["influxdb"]
-    
-    
-    # Enable InfluxDB logging if token, org, and bucket are provided
-    if influx_config["enabled"] == True:
-        
+
+    influx_config = raw_config["influxdb"]
+    influx_enabled = bool(influx_config["enabled"])
+
+    # Enable InfluxDB logging if url, token, org, and bucket are provided
+    if influx_enabled:
         influx_config["url"] = os.getenv("INFLUXDB_URL", influx_config["url"])
         influx_config["token"] = os.getenv("INFLUXDB_TOKEN", influx_config["token"])
         influx_config["org"] = os.getenv("INFLUXDB_ORG", influx_config["org"])
         influx_config["bucket"] = os.getenv("INFLUXDB_BUCKET", influx_config["bucket"])
-        
-        if influx_config["token"] and influx_config["org"] and influx_config["bucket"]:
+
+        if influx_config["url"] and influx_config["token"] and influx_config["org"] and influx_config["bucket"]:
             logging.info("InfluxDB logging enabled based on environment variables.")
         else:
-            influx_config["enabled"] = False
-            logging.warning("InfluxDB logging disabled. Missing INFLUXDB_TOKEN, INFLUXDB_ORG, or INFLUXDB_BUCKET environment variables.")
+            influx_enabled = False
+            logging.warning("InfluxDB logging disabled. Missing INFLUXDB_URL, INFLUXDB_TOKEN, INFLUXDB_ORG, or INFLUXDB_BUCKET environment variables.")
 
     # Email password
-    if CONFIG["notification"]["email"]["enabled"]:
-        email_config = CONFIG["notification"]["email"]
+    email_config = raw_config["notification"]["email"]
+    email_enabled = bool(email_config["enabled"])
+    if email_enabled:
         email_config["password"] = os.getenv("EMAIL_PASSWORD", email_config["password"])
         if not email_config["password"]:
-             logging.warning("Email notifications enabled but EMAIL_PASSWORD environment variable is not set.")
+            email_enabled = False
+            logging.warning("Email notifications enabled but EMAIL_PASSWORD environment variable is not set.")
 
     # Slack Webhook URL
-    if CONFIG["notification"]["slack"]["enabled"]:
-        slack_config = CONFIG["notification"]["slack"]
+    slack_config = raw_config["notification"]["slack"]
+    slack_enabled = bool(slack_config["enabled"])
+    if slack_enabled:
         slack_config["webhook_url"] = os.getenv("SLACK_WEBHOOK_URL", slack_config["webhook_url"])
         if not slack_config["webhook_url"]:
+            slack_enabled = False
             logging.warning("Slack notifications enabled but SLACK_WEBHOOK_URL environment variable is not set.")
 
     # Teams Webhook URL (assuming similar env var naming)
-    if CONFIG["notification"]["teams"]["enabled"]:
-        teams_config = CONFIG["notification"]["teams"]
+    teams_config = raw_config["notification"]["teams"]
+    teams_enabled = bool(teams_config["enabled"])
+    if teams_enabled:
         teams_config["webhook_url"] = os.getenv("TEAMS_WEBHOOK_URL", teams_config["webhook_url"])
         if not teams_config["webhook_url"]:
+            teams_enabled = False
             logging.warning("Teams notifications enabled but TEAMS_WEBHOOK_URL environment variable is not set.")
 
+    receivers = email_config["receiver_email"]
+    alert_window_hours = float(raw_config["alert_window_hours"])
+    CONFIG = AppCfg(
+        services=tuple(raw_config["services"]),
+        scan_interval_minutes=raw_config["scan_interval_minutes"],
+        watchdog_interval_minutes=raw_config.get("watchdog_interval_minutes", 60),
+        alert_threshold=int(raw_config["alert_threshold"]),
+        alert_window_hours=alert_window_hours,
+        alert_window_seconds=alert_window_hours * 3600,
+        email=EmailCfg(
+            enabled=email_enabled,
+            smtp_server=email_config["smtp_server"],
+            smtp_port=int(email_config["smtp_port"]),
+            sender=email_config["sender_email"],
+            receivers=(receivers,) if isinstance(receivers, str) else tuple(receivers),
+            password=email_config.get("password")
+        ),
+        slack=WebhookCfg(enabled=slack_enabled, webhook_url=slack_config.get("webhook_url")),
+        teams=WebhookCfg(enabled=teams_enabled, webhook_url=teams_config.get("webhook_url")),
+        influx=InfluxCfg(
+            enabled=influx_enabled,
+            url=influx_config.get("url"),
+            token=influx_config.get("token"),
+            org=influx_config.get("org"),
+            bucket=influx_config.get("bucket")
+        )
+    )
 
     logging.debug(f"Final Configuration (after env override): {CONFIG}")
 
 
-# Service failure tracking
-service_failures = defaultdict(list)
+# Service failure tracking: (monotonic seconds, wall-clock datetime) per failure.
+# The monotonic time drives the alert window; the datetime is only for display.
+service_failures = defaultdict(deque)
+_failures_lock = threading.Lock()
+
+# DBus unit objects, loaded once per service and reused across scans. They share one
+# system bus connection, which must not be used from two threads at once.
+_systemd_units = {}
+_systemd_bus = None
+_systemd_lock = threading.RLock()
+
+def _unit_name(service_name):
+    """Return the full systemd unit name for a service (e.g. nginx -> nginx.service)."""
+    return service_name if "." in service_name else f"{service_name}.service"
+
+def _get_systemd_unit(service_name):
+    """Return the cached DBus unit object for a service, loading it on first use."""
+    global _systemd_bus
+    with _systemd_lock:
+        unit = _systemd_units.get(service_name)
+        if unit is None:
+            if _systemd_bus is None:
+                _systemd_bus = DBus()
+                _systemd_bus.open()
+            unit = SystemdUnit(_unit_name(service_name).encode(), bus=_systemd_bus)
+            unit.load()
+            _systemd_units[service_name] = unit
+        return unit
+
+def _close_systemd_bus():
+    """Drop the cached unit objects and close the shared system bus connection."""
+    global _systemd_bus
+    with _systemd_lock:
+        _systemd_units.clear()
+        if _systemd_bus is not None:
+            _systemd_bus.close()
+            _systemd_bus = None
+
+# Open /proc/<MainPID>/stat descriptors per service, so a running service can be
+# confirmed with a single read instead of a DBus round-trip
+_main_pid_fds = {}
+_ALIVE_PROCESS_STATES = {"R", "S", "D", "I"}
+
+def _main_pid_alive(service_name):
+    """Return True if the cached main process of a service is still running."""
+    fd = _main_pid_fds.get(service_name)
+    if fd is None:
+        return False
+    try:
+        stat = os.pread(fd, 512, 0).decode(errors="replace")
+        # The process state follows the parenthesized command name, which may itself contain ")"
+        state = stat[stat.rindex(")") + 2]
+    except (OSError, ValueError, IndexError):
+        # The process is gone (its /proc entry now fails with ESRCH)
+        state = None
+    if state in _ALIVE_PROCESS_STATES:
+        return True
+    _forget_main_pid(service_name)
+    return False
+
+def _forget_main_pid(service_name):
+    """Close the cached /proc stat descriptor of a service, if any."""
+    fd = _main_pid_fds.pop(service_name, None)
+    if fd is not None:
+        os.close(fd)
+
+def _check_service_dbus(service_name):
+    """Check a service, preferring its cached main PID and falling back to DBus ActiveState."""
+    if _main_pid_alive(service_name):
+        return True
+
+    unit = _get_systemd_unit(service_name)
+    if unit.Unit.ActiveState != b"active":
+        return False
 
-def check_service(service_name):
-    """Check if a service is running using systemctl."""
+    # Cache the main process so the next scans can skip DBus while it stays alive
+    try:
+        main_pid = unit.Service.MainPID
+        if main_pid > 0:
+            _main_pid_fds[service_name] = os.open(f"/proc/{main_pid}/stat", os.O_RDONLY)
+    except (AttributeError, OSError):
+        # Not a service unit, no main process, or it exited in the meantime
+        pass
+    return True
+
+def _check_services_dbus(service_names):
+    """Check services over the persistent systemd DBus connection."""
+    with _systemd_lock:
+        return {name: _check_service_dbus(name) for name in service_names}
+
+def check_services(service_names):
+    """Check several services at once. Returns {service_name: is_active}."""
+    if not service_names:
+        return {}
+
+    global SystemdUnit
+    if SystemdUnit is not None:
+        try:
+            return _check_services_dbus(service_names)
+        except Exception as e:
+            # No usable system bus (e.g. inside a container); stop trying and use systemctl
+            logging.warning(f"systemd DBus check failed, falling back to systemctl: {e}")
+            SystemdUnit = None
+            _close_systemd_bus()
+            for name in list(_main_pid_fds):
+                _forget_main_pid(name)
 
+    return _check_services_systemctl(service_names)
+
+def _check_services_systemctl(service_names):
+    """Check several services with a single systemctl call."""
     try:
+        # systemctl prints one state per unit, in the order the units were given
         result = subprocess.run(
-            ["systemctl", "is-active", service_name],
+            ["systemctl", "is-active", *service_names],
             capture_output=True,
             text=True,
             check=False
         )
-        return result.stdout.strip() == "active"
+        states = result.stdout.splitlines()
+        if len(states) != len(service_names):
+            logging.error(f"Unexpected systemctl output for services {', '.join(service_names)}: {result.stdout!r} {result.stderr!r}")
+            if len(service_names) == 1:
+                return {service_names[0]: False}
+            # e.g. an invalid unit name makes systemctl fail before printing any state;
+            # check one by one so only the offending unit is reported down
+            return {name: _check_services_systemctl([name])[name] for name in service_names}
+        return {name: state.strip() == "active" for name, state in zip(service_names, states)}
     except FileNotFoundError:
         logging.error("systemctl command not found. Are you running in a systemd-enabled environment?")
-        return False
+        return {name: False for name in service_names}
     except Exception as e:
-        logging.error(f"Error checking service {service_name}: {e}")
-        return False
+        logging.error(f"Error checking services {', '.join(service_names)}: {e}")
+        return {name: False for name in service_names}
+
+def check_service(service_name):
+    """Check if a service is running using systemctl."""
+    return check_services([service_name])[service_name]
 
 def restart_service(service_name):
     """Attempt to restart a service."""
@@ -130,42 +345,95 @@ def restart_service(service_name):
 
 def record_failure(service_name):
     """Record a service failure with timestamp."""
-    now = datetime.now()
-    service_failures[service_name].append(now)
+    window_seconds = CONFIG.alert_window_seconds
+    threshold = CONFIG.alert_threshold
+
+    with _failures_lock:
+        now = time.monotonic()
+        failures = service_failures[service_name]
+        failures.append((now, datetime.now()))
 
-    # Clean up old failure records
-    cutoff_time = now - timedelta(hours=CONFIG["alert_window_hours"])
-    service_failures[service_name] = [t for t in service_failures[service_name] if t >= cutoff_time]
+        # Clean up old failure records; timestamps are appended in order, so expired ones are at the left
+        cutoff_time = now - window_seconds
+        while failures and failures[0][0] < cutoff_time:
+            failures.popleft()
 
-    # Check if we need to send an alert
-    if len(service_failures[service_name]) >= CONFIG["alert_threshold"]:
-        send_alert(service_name)
+        # Check if we need to send an alert
+        if len(failures) >= threshold:
+            send_alert(service_name)
 
     # Save failure event to InfluxDB
-    if CONFIG["influxdb"]["enabled"]:
+    if CONFIG.influx.enabled:
         save_to_influxdb(service_name, "failure", success=False)
 
 
-def send_email_alert(service_name):
+# A single SMTP session is kept open and shared by all email alerts, so each
+# alert does not pay for its own TCP connect, STARTTLS and login.
+_smtp_lock = threading.Lock()
+_smtp_conn = None
+# Bounds every SMTP socket operation; a hung server must not hold _smtp_lock indefinitely
+SMTP_TIMEOUT_SECONDS = 10
+
+def _get_smtp():
+    """Return the shared SMTP session, reconnecting if it is no longer alive. Caller must hold _smtp_lock."""
+    global _smtp_conn
+
+    if _smtp_conn is not None:
+        try:
+            if _smtp_conn.noop()[0] == 250:
+                return _smtp_conn
+        except (smtplib.SMTPException, OSError):
+            pass
+        _reset_smtp()
+
+    server = smtplib.SMTP(CONFIG.email.smtp_server, CONFIG.email.smtp_port, timeout=SMTP_TIMEOUT_SECONDS)
+    try:
+        server.starttls()
+        server.login(CONFIG.email.sender, CONFIG.email.password)
+    except Exception:
+        server.close()
+        raise
+    _smtp_conn = server
+    return _smtp_conn
+
+def _reset_smtp():
+    """Drop the shared SMTP session without raising. Caller must hold _smtp_lock."""
+    global _smtp_conn
+    if _smtp_conn is not None:
+        try:
+            _smtp_conn.quit()
+        except Exception:
+            _smtp_conn.close()
+        _smtp_conn = None
+
+def close_smtp():
+    """Close the shared SMTP session."""
+    with _smtp_lock:
+        _reset_smtp()
+
+atexit.register(close_smtp)
+
+def send_email_alert(service_name, failures, ts_block):
     """Send an email alert about repeated service failures."""
-    email_config = CONFIG["notification"]["email"]
-    if not email_config["enabled"] or not email_config["password"]:
+    if not CONFIG.email.enabled:
         logging.debug("Email notifications not enabled or password missing.")
         return
 
     try:
+        window_hours = CONFIG.alert_window_hours
+
         msg = MIMEMultipart()
-        msg["From"] = email_config["sender_email"]
-        msg["To"] = email_config["receiver_email"]
+        msg["From"] = CONFIG.email.sender
+        # All receivers are addressed in one message, so one SMTP transaction covers them
+        msg["To"] = ", ".join(CONFIG.email.receivers)
         msg["Subject"] = f"ALERT: Service {service_name} has failed multiple times"
 
         # Email body
-        failures = service_failures[service_name]
         body = f"""
-        The service {service_name} has failed {len(failures)} times in the past {CONFIG['alert_window_hours']} hour(s).
+        The service {service_name} has failed {len(failures)} times in the past {window_hours} hour(s).
 
         Failure timestamps:
-        {chr(10).join([t.strftime('%Y-%m-%d %H:%M:%S') for t in failures])}
+        {ts_block}
 
         Automated attempts to restart the service have been unsuccessful (or attempted).
         Please check the system manually.
@@ -176,54 +444,104 @@ def send_email_alert(service_name):
 
         msg.attach(MIMEText(body, "plain"))
 
-        with smtplib.SMTP(email_config["smtp_server"], email_config["smtp_port"]) as server:
-            server.starttls()
-            server.login(email_config["sender_email"], email_config["password"])
-            server.send_message(msg)
+        with _smtp_lock:
+            try:
+                _get_smtp().send_message(msg)
+            except (smtplib.SMTPException, OSError):
+                # The server may have dropped the idle session; reconnect and retry once
+                _reset_smtp()
+                _get_smtp().send_message(msg)
 
         logging.info(f"Email alert sent for service {service_name}")
     except Exception as e:
         logging.error(f"Failed to send email alert for service {service_name}: {e}")
 
-def send_slack_alert(service_name):
+# Shared HTTP session for Slack/Teams webhooks; keeps TLS connections alive between alerts.
+# urllib3 does not retry POST by default; it is allowed here, as a duplicate alert beats a lost one.
+_http = requests.Session()
+_http.mount("https://", HTTPAdapter(
+    pool_connections=2,
+    pool_maxsize=4,
+    max_retries=Retry(
+        total=2,
+        backoff_factor=0.3,
+        status_forcelist=[429, 500, 502, 503, 504],
+        allowed_methods=frozenset({"POST"})
+    )
+))
+WEBHOOK_TIMEOUT_SECONDS = 5
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+def _json_template(payload):
+    """Serialize a payload once into a str.format_map template, keeping {name} placeholders."""
+    body = json.dumps(payload).replace("{", "{{").replace("}", "}}")
+    return re.sub(r"\{\{(\w+)\}\}", r"{\1}", body)
+
+def _render_json(template, **values):
+    """Fill a JSON template, escaping each value as the contents of a JSON string."""
+    return template.format_map({key: json.dumps(str(value))[1:-1] for key, value in values.items()}).encode()
+
+# Webhook payloads are serialized once; each alert only substitutes the placeholders
+SLACK_TEMPLATE = _json_template({
+    "text": "🚨 *ALERT*: Service `{service}` has failed multiple times",
+    "blocks": [
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "🚨 *ALERT*: Service `{service}` has failed {count} times in the past {hours} hour(s)."
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "*Failure timestamps:*\n{ts_block}"
+            }
+        },
+        {
+            "type": "section",
+            "text": {
+                "type": "mrkdwn",
+                "text": "Automated attempts to restart the service have been unsuccessful (or attempted). Please check the system manually."
+            }
+        }
+    ]
+})
+
+# Teams webhook payload structure can vary, this is a basic card
+TEAMS_TEMPLATE = _json_template({
+    "@type": "MessageCard",
+    "@context": "http://schema.org/extensions",
+    "summary": "ALERT: Service {service} has failed multiple times",
+    "sections": [{
+        "activityTitle": "Service Failure Alert: {service}",
+        "activitySubtitle": "Failed {count} times in the past {hours} hour(s)",
+        "facts": [{
+            "name": "Failure Timestamps",
+            "value": "{ts_block}"
+        }],
+        "text": "Automated attempts to restart the service have been unsuccessful (or attempted). Please check the system manually."
+    }],
+    "themeColor": "FF0000" # Red color for alert
+})
+
+def send_slack_alert(service_name, failures, ts_block):
     """Send a Slack alert about repeated service failures."""
-    slack_config = CONFIG["notification"]["slack"]
-    if not slack_config["enabled"] or not slack_config["webhook_url"]:
+    if not CONFIG.slack.enabled:
         logging.debug("Slack notifications not enabled or webhook URL missing.")
         return
 
     try:
-        webhook_url = slack_config["webhook_url"]
-        failures = service_failures[service_name]
-
-        message = {
-            "text": f"🚨 *ALERT*: Service `{service_name}` has failed multiple times",
-            "blocks": [
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"🚨 *ALERT*: Service `{service_name}` has failed {len(failures)} times in the past {CONFIG['alert_window_hours']} hour(s)."
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*Failure timestamps:*\n" + "\n".join([t.strftime('• %Y-%m-%d %H:%M:%S') for t in failures])
-                    }
-                },
-                {
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": "Automated attempts to restart the service have been unsuccessful (or attempted). Please check the system manually."
-                    }
-                }
-            ]
-        }
+        body = _render_json(
+            SLACK_TEMPLATE,
+            service=service_name,
+            count=len(failures),
+            hours=CONFIG.alert_window_hours,
+            ts_block=ts_block
+        )
 
-        response = requests.post(webhook_url, json=message)
+        response = _http.post(CONFIG.slack.webhook_url, data=body, headers=JSON_HEADERS, timeout=WEBHOOK_TIMEOUT_SECONDS)
         if response.status_code == 200:
             logging.info(f"Slack alert sent for service {service_name}")
         else:
@@ -232,35 +550,22 @@ def send_slack_alert(service_name):
         logging.error(f"Failed to send Slack alert for service {service_name}: {e}")
 
 # Assuming Teams works similarly to Slack webhooks
-def send_teams_alert(service_name):
+def send_teams_alert(service_name, failures, ts_block):
     """Send a Microsoft Teams alert about repeated service failures."""
-    teams_config = CONFIG["notification"]["teams"]
-    if not teams_config["enabled"] or not teams_config["webhook_url"]:
+    if not CONFIG.teams.enabled:
         logging.debug("Teams notifications not enabled or webhook URL missing.")
         return
 
     try:
-        webhook_url = teams_config["webhook_url"]
-        failures = service_failures[service_name]
-
-        # Teams webhook payload structure can vary, this is a basic card
-        message = {
-            "@type": "MessageCard",
-            "@context": "http://schema.org/extensions",
-            "summary": f"ALERT: Service {service_name} has failed multiple times",
-            "sections": [{
-                "activityTitle": f"Service Failure Alert: {service_name}",
-                "activitySubtitle": f"Failed {len(failures)} times in the past {CONFIG['alert_window_hours']} hour(s)",
-                "facts": [{
-                    "name": "Failure Timestamps",
-                    "value": "\n".join([t.strftime('%Y-%m-%d %H:%M:%S') for t in failures])
-                }],
-                "text": "Automated attempts to restart the service have been unsuccessful (or attempted). Please check the system manually."
-            }],
-            "themeColor": "FF0000" # Red color for alert
-        }
+        body = _render_json(
+            TEAMS_TEMPLATE,
+            service=service_name,
+            count=len(failures),
+            hours=CONFIG.alert_window_hours,
+            ts_block=ts_block
+        )
 
-        response = requests.post(webhook_url, json=message)
+        response = _http.post(CONFIG.teams.webhook_url, data=body, headers=JSON_HEADERS, timeout=WEBHOOK_TIMEOUT_SECONDS)
         # Teams webhooks return 200 OK on success
         if response.status_code == 200:
             logging.info(f"Teams alert sent for service {service_name}")
@@ -271,110 +576,354 @@ def send_teams_alert(service_name):
         logging.error(f"Failed to send Teams alert for service {service_name}: {e}")
 
 
+# Alerts are sent from a small worker pool so slow SMTP or webhook calls do not stall the scan
+_notify_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="notify")
+atexit.register(lambda: _notify_pool.shutdown(wait=True, cancel_futures=False))
+
+def _log_notify_error(future):
+    """Log an exception raised by a notifier running in the worker pool."""
+    error = future.exception()
+    if error is not None:
+        logging.error(f"Notification task failed: {error}")
+
+# Repeat alerts for a service are throttled with an exponentially growing cooldown,
+# reset once the service has been seen healthy for a few consecutive scans.
+# Guarded by _failures_lock, which record_failure holds while calling send_alert.
+ALERT_BACKOFF_INITIAL_SECONDS = 60
+ALERT_BACKOFF_MAX_SECONDS = 3600
+HEALTHY_SCANS_TO_RESET_BACKOFF = 3
+_last_alert_at = {}
+_alert_backoff = {}
+_healthy_streak = defaultdict(int)
+
+def _alert_allowed(service_name):
+    """Return True if the service is out of its alert cooldown, and start the next cooldown."""
+    now = time.monotonic()
+    last_alert = _last_alert_at.get(service_name)
+    if last_alert is None:
+        _alert_backoff[service_name] = ALERT_BACKOFF_INITIAL_SECONDS
+    else:
+        cooldown = _alert_backoff[service_name]
+        if now - last_alert < cooldown:
+            return False
+        _alert_backoff[service_name] = min(cooldown * 2, ALERT_BACKOFF_MAX_SECONDS)
+    _last_alert_at[service_name] = now
+    return True
+
+def _note_service_health(service_name, is_active):
+    """Track consecutive healthy scans and clear the alert backoff once a service has recovered."""
+    if not is_active:
+        _healthy_streak[service_name] = 0
+        return
+
+    _healthy_streak[service_name] += 1
+    if _healthy_streak[service_name] >= HEALTHY_SCANS_TO_RESET_BACKOFF and service_name in _last_alert_at:
+        with _failures_lock:
+            _last_alert_at.pop(service_name, None)
+            _alert_backoff.pop(service_name, None)
+        logging.info(f"Service {service_name} has recovered, alert backoff reset")
+
 def send_alert(service_name):
     """Send alerts through configured channels."""
-    logging.warning(f"Alert triggered for service {service_name} - {len(service_failures[service_name])} failures")
+    # Snapshot the failures so later record_failure calls cannot change what the notifiers see
+    failures = tuple(wall_time for _, wall_time in service_failures[service_name])
+    if not _alert_allowed(service_name):
+        logging.info(f"Alert for service {service_name} suppressed, still within the {_alert_backoff[service_name]}s cooldown")
+        return
+    logging.warning(f"Alert triggered for service {service_name} - {len(failures)} failures")
 
-    if CONFIG["notification"]["email"]["enabled"]:
-        send_email_alert(service_name)
+    if not (CONFIG.email.enabled or CONFIG.slack.enabled or CONFIG.teams.enabled):
+        return
+
+    # Format the timestamps once and share them between all channels
+    ts_lines = [t.strftime('%Y-%m-%d %H:%M:%S') for t in failures]
+    ts_block_plain = "\n".join(ts_lines)
+
+    if CONFIG.email.enabled:
+        _notify_pool.submit(send_email_alert, service_name, failures, ts_block_plain).add_done_callback(_log_notify_error)
 
-    if CONFIG["notification"]["slack"]["enabled"]:
-        send_slack_alert(service_name)
-    if CONFIG["notification"]["teams"]["enabled"]:
-        send_teams_alert(service_name)
+    if CONFIG.slack.enabled:
+        ts_block_slack = "\n".join("• " + line for line in ts_lines)
+        _notify_pool.submit(send_slack_alert, service_name, failures, ts_block_slack).add_done_callback(_log_notify_error)
+    if CONFIG.teams.enabled:
+        _notify_pool.submit(send_teams_alert, service_name, failures, ts_block_plain).add_done_callback(_log_notify_error)
 
 # --- End Alert Sending Functions ---
 
 
 # --- InfluxDB 2.x Data Writing ---
+# A single client and batching write API are shared by all events, so each
+# event no longer pays for its own connection setup and blocking HTTP request.
+_influx_client = None
+_influx_write_api = None
+
+def get_influx_writer():
+    """Return the shared InfluxDB write API, creating it on first use."""
+    global _influx_client, _influx_write_api
+    if _influx_write_api is None:
+        _influx_client = InfluxDBClient(url=CONFIG.influx.url, token=CONFIG.influx.token, org=CONFIG.influx.org)
+        # Points are buffered and flushed in the background every 500 points or 5 seconds
+        _influx_write_api = _influx_client.write_api(write_options=WriteOptions(batch_size=500, flush_interval=5_000))
+    return _influx_write_api
+
+def close_influxdb():
+    """Flush any buffered points and close the shared InfluxDB client."""
+    global _influx_client, _influx_write_api
+    if CONFIG is not None and CONFIG.influx.enabled:
+        flush_influxdb()
+    if _influx_write_api is not None:
+        _influx_write_api.close()
+        _influx_write_api = None
+    if _influx_client is not None:
+        _influx_client.close()
+        _influx_client = None
+
+atexit.register(close_influxdb)
+
+# Events recorded during a scan are collected here and written together by flush_influxdb
+_pending_lines = []
+_pending_lock = threading.Lock()
+
+# Line protocol requires commas, spaces and equals signs in tag values to be escaped
+_TAG_ESCAPES = str.maketrans({",": r"\,", " ": r"\ ", "=": r"\="})
+
 def save_to_influxdb(service_name, event_type, success=False):
     """Save event data to InfluxDB 2.x."""
-    influx_config = CONFIG["influxdb"]
-    if not influx_config["enabled"]:
+    if not CONFIG.influx.enabled:
         return
 
-    # Check if essential InfluxDB 2.x parameters are available
-    if not influx_config.get("url") or not influx_config.get("token") or \
-       not influx_config.get("org") or not influx_config.get("bucket"):
-        logging.error("InfluxDB 2.x logging is enabled but connection parameters (URL, Token, Org, Bucket) are missing.")
+    # Build the line protocol record directly instead of going through the Point builder
+    value = 1 if event_type != "check" else (1 if success else 0)
+    line = (
+        f"service_events,service={service_name.translate(_TAG_ESCAPES)},event_type={event_type.translate(_TAG_ESCAPES)} "
+        f"success={'true' if success else 'false'},value={value}i {time.time_ns()}"
+    )
+    with _pending_lock:
+        _pending_lines.append(line)
+
+    logging.debug(f"Queued {event_type} event for {service_name} for InfluxDB 2.x")
+
+def flush_influxdb():
+    """Write all events queued since the last flush to InfluxDB 2.x in a single call."""
+    if not CONFIG.influx.enabled:
         return
 
+    with _pending_lock:
+        if not _pending_lines:
+            return
+        lines = _pending_lines[:]
+        _pending_lines.clear()
+
     try:
-        
-        with InfluxDBClient(url=influx_config["url"], token=influx_config["token"], org=influx_config["org"]) as client:
-            # Use the write_api with SYNCHRONOUS mode for immediate write (simple, but less performant for bulk)
-            # For better performance, use ASYNCHRONOUS or BATCHING
-            write_api = client.write_api(write_options=SYNCHRONOUS)
-
-            # Create a data point
-            point = Point("service_events") \
-                .tag("service", service_name) \
-                .tag("event_type", event_type) \
-                .field("success", success) \
-                .field("value", 1 if event_type != "check" else (1 if success else 0)) \
-                .time(datetime.utcnow(), WritePrecision.NS) # Use UTC and nanosecond precision
-
-            # Write the point to the specified bucket
-            write_api.write(bucket=influx_config["bucket"], record=point)
-
-        logging.debug(f"Saved {event_type} event for {service_name} to InfluxDB 2.x bucket {influx_config['bucket']}")
+        get_influx_writer().write(bucket=CONFIG.influx.bucket, org=CONFIG.influx.org, record=lines, write_precision=WritePrecision.NS)
+        logging.debug(f"Queued {len(lines)} events to InfluxDB 2.x bucket {CONFIG.influx.bucket}")
     except Exception as e:
         logging.error(f"Failed to save data to InfluxDB 2.x: {e}")
 
+# Serializes down-service handling between the periodic scan and the DBus failure watcher
+_scan_lock = threading.Lock()
+
+def handle_down_service(service):
+    """Try to restart a service that is down, recording a failure if the restart fails."""
+    logging.warning(f"Service {service} is down, attempting to restart")
+
+    restart_success = restart_service(service)
+
+    if restart_success:
+        logging.info(f"Service {service} restarted successfully")
+        if CONFIG.influx.enabled:
+            save_to_influxdb(service, "restart", True)
+    else:
+        logging.error(f"Failed to restart service {service}")
+        record_failure(service) # This will also trigger alert logic and save to InfluxDB
+
 def scan_services():
     """Scan all configured services and handle any that are down."""
+    services = CONFIG.services
+    if not services:
+        return
+
+    influx_on = CONFIG.influx.enabled
     logging.info("Starting service scan...")
 
-    for service in CONFIG["services"]:
-        logging.debug(f"Checking service: {service}")
+    with _scan_lock:
+        down_services = []
+        for service, is_active in check_services(services).items():
+            logging.debug(f"Checking service: {service}")
+            _note_service_health(service, is_active)
+
+            if is_active:
+                logging.debug(f"Service {service} is running")
+                # Optionally log successful check
+                if influx_on:
+                    save_to_influxdb(service, "check", True)
+            else:
+                down_services.append(service)
 
-        if check_service(service):
-            logging.debug(f"Service {service} is running")
-            # Optionally log successful check
-            if CONFIG["influxdb"]["enabled"]:
-                 save_to_influxdb(service, "check", True)
-        else:
-            logging.warning(f"Service {service} is down, attempting to restart")
+        # Restarts are independent and can each block for seconds, so run them concurrently
+        if down_services:
+            with ThreadPoolExecutor(max_workers=min(16, len(down_services)), thread_name_prefix="restart") as executor:
+                list(executor.map(handle_down_service, down_services))
 
-            restart_success = restart_service(service)
-
-            if restart_success:
-                logging.info(f"Service {service} restarted successfully")
-                if CONFIG["influxdb"]["enabled"]:
-                    save_to_influxdb(service, "restart", True)
-            else:
-                logging.error(f"Failed to restart service {service}")
-                record_failure(service) # This will also trigger alert logic and save to InfluxDB
+        if influx_on:
+            flush_influxdb()
 
     logging.info("Service scan completed")
 
+# --- systemd DBus Failure Watcher ---
+# A unit that stopped cleanly (inactive) is as down as one that failed
+_DOWN_ACTIVE_STATES = {b"failed", b"inactive"}
+# Last ActiveState seen per unit path; systemd repeats ActiveState alongside unrelated property changes
+_unit_active_states = {}
+# Set when the watcher thread exits; monitor() then goes back to the regular scan interval
+_watcher_stopped = threading.Event()
+# Services whose watcher-triggered restart is still running
+_restarts_in_flight = set()
+_restarts_lock = threading.Lock()
+
+def _handle_unit_down(service):
+    """Restart a service reported down by the watcher, then allow further reactions to it."""
+    try:
+        with _scan_lock:
+            handle_down_service(service)
+            flush_influxdb()
+    finally:
+        with _restarts_lock:
+            _restarts_in_flight.discard(service)
+
+def _on_unit_properties_changed(msg, error=None, userdata=None):
+    """Handle a PropertiesChanged signal and react when a monitored unit changes into a down state."""
+    msg.process_reply(True)
+    service = userdata.get(msg.path)
+    if service is None:
+        return
+
+    _interface, changed, _invalidated = msg.body
+    state = changed.get(b"ActiveState")
+    if state is None:
+        return
+
+    previous = _unit_active_states.get(msg.path)
+    _unit_active_states[msg.path] = state
+    if state not in _DOWN_ACTIVE_STATES or previous in _DOWN_ACTIVE_STATES:
+        return
+
+    # A failing restart of our own moves the unit activating -> failed again; don't chase it
+    with _restarts_lock:
+        if service in _restarts_in_flight:
+            return
+        _restarts_in_flight.add(service)
+
+    logging.warning(f"systemd reported service {service} as {state.decode()}")
+    # Restart off the watcher thread so signals keep being consumed while it runs
+    threading.Thread(target=_handle_unit_down, args=(service,), name=f"restart-{service}", daemon=True).start()
+
+def _watch_unit_failures(unit_paths):
+    """Subscribe to systemd unit signals and dispatch failures until the process exits."""
+    try:
+        with DBus() as bus:
+            manager = SystemdManager(bus=bus)
+            manager.load()
+            manager.Manager.Subscribe()
+            bus.match_signal(
+                b"org.freedesktop.systemd1",
+                None,
+                b"org.freedesktop.DBus.Properties",
+                b"PropertiesChanged",
+                _on_unit_properties_changed,
+                unit_paths,
+            )
+            fd = bus.get_fd()
+            while True:
+                select.select([fd], [], [])
+                bus.process()
+    except Exception as e:
+        logging.error(f"systemd failure watcher stopped: {e}")
+    finally:
+        _watcher_stopped.set()
+
+def start_failure_watcher(services):
+    """Start a background thread reacting to systemd failure signals. Returns True if it was started."""
+    if SystemdUnit is None:
+        return False
+
+    try:
+        unit_paths = {_get_systemd_unit(service).path: service for service in services}
+    except Exception as e:
+        logging.warning(f"Could not resolve systemd units, failure watcher disabled: {e}")
+        return False
+
+    threading.Thread(target=_watch_unit_failures, args=(unit_paths,), name="systemd-watcher", daemon=True).start()
+    logging.info("Watching systemd for service failures")
+    return True
+
+# Longest the monitor loop sleeps before re-checking the failure watcher
+MONITOR_WAKE_SECONDS = 60
+
+async def monitor(scan_interval_minutes, fallback_interval_minutes=None):
+    """Run scans every scan_interval_minutes (or none if None) until SIGINT/SIGTERM is received.
+
+    If fallback_interval_minutes is given, switch to it once the DBus failure watcher has stopped.
+    """
+    loop = asyncio.get_running_loop()
+    stop = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    interval_seconds = None if scan_interval_minutes is None else scan_interval_minutes * 60
+    next_scan = None if interval_seconds is None else loop.time() + interval_seconds
+    while True:
+        if fallback_interval_minutes is not None and _watcher_stopped.is_set():
+            logging.warning(f"systemd failure watcher is gone, scanning every {fallback_interval_minutes} minutes")
+            interval_seconds = fallback_interval_minutes * 60
+            next_scan = min(next_scan, loop.time() + interval_seconds)
+            fallback_interval_minutes = None
+
+        timeout = MONITOR_WAKE_SECONDS if next_scan is None else max(0, min(next_scan - loop.time(), MONITOR_WAKE_SECONDS))
+        try:
+            # The loop sleeps until the next scan is due or a stop signal arrives
+            await asyncio.wait_for(stop.wait(), timeout=timeout)
+            break
+        except asyncio.TimeoutError:
+            if next_scan is not None and loop.time() >= next_scan:
+                # Scans block on systemctl and locks, so run them off the event loop
+                await asyncio.to_thread(scan_services)
+                next_scan = loop.time() + interval_seconds
+
 def main():
     """Main function to schedule and run the service doctor."""
     load_config()
 
     logging.info("Linux Service Doctor starting...")
-    if not CONFIG["services"]:
-         logging.warning("No services configured for monitoring in CONFIG['services']. The script will run but do nothing.")
+    if not CONFIG.services:
+         logging.warning("No services configured for monitoring in CONFIG.services. The script will run but do nothing.")
     else:
-        logging.info(f"Monitoring services: {', '.join(CONFIG['services'])}")
-    logging.info(f"Scan interval: {CONFIG['scan_interval_minutes']} minutes")
-    if CONFIG["influxdb"]["enabled"]:
-        logging.info(f"InfluxDB logging enabled. URL: {CONFIG['influxdb']['url']}, Org: {CONFIG['influxdb']['org']}, Bucket: {CONFIG['influxdb']['bucket']}")
+        logging.info(f"Monitoring services: {', '.join(CONFIG.services)}")
+    logging.info(f"Scan interval: {CONFIG.scan_interval_minutes} minutes")
+    if CONFIG.influx.enabled:
+        logging.info(f"InfluxDB logging enabled. URL: {CONFIG.influx.url}, Org: {CONFIG.influx.org}, Bucket: {CONFIG.influx.bucket}")
     else:
         logging.warning("InfluxDB logging is disabled.")
 
 
     # Run once immediately (only if services are configured)
-    if CONFIG["services"]:
+    if CONFIG.services:
         scan_services()
     else:
         logging.info("Skipping initial scan as no services are configured.")
 
 
     # Schedule regular scans (only if services are configured)
-    if CONFIG["services"]:
-        schedule.every(CONFIG["scan_interval_minutes"]).minutes.do(scan_services)
-        logging.info(f"Scheduling scans every {CONFIG['scan_interval_minutes']} minutes.")
+    scan_interval = None
+    fallback_interval = None
+    if CONFIG.services:
+        if start_failure_watcher(CONFIG.services):
+            # Failures arrive as systemd signals; the periodic scan is only a safety net
+            scan_interval = CONFIG.watchdog_interval_minutes
+            fallback_interval = CONFIG.scan_interval_minutes
+        else:
+            scan_interval = CONFIG.scan_interval_minutes
+        logging.info(f"Scheduling scans every {scan_interval} minutes.")
     else:
         logging.info("No services configured, scheduling skipped.")
 
@@ -382,9 +931,8 @@ def main():
     # Keep the script running
     logging.info("Service monitoring is active")
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(1)
+        asyncio.run(monitor(scan_interval, fallback_interval))
+        logging.info("Service monitoring stopped")
     except KeyboardInterrupt:
         logging.info("Service monitoring stopped by user")
     except Exception as e:
@@ -6,23 +6,40 @@ import time
 import smtplib
 import logging
 import json
+import re
 import os
+import atexit
+import queue
+import multiprocessing
+import signal
+import threading
 from abc import ABC, abstractmethod
-from datetime import datetime, timedelta
-from collections import defaultdict
+from datetime import datetime
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
 
 import requests
-import redis
-import pymongo
-from influxdb_client import InfluxDBClient, Point, WritePrecision
-from influxdb_client.client.write_api import SYNCHRONOUS
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+# Optional: talk to systemd over DBus instead of spawning systemctl
+try:
+    from pystemd.dbuslib import DBus
+    from pystemd.systemd1 import Manager as SystemdManager, Unit as SystemdUnit
+except ImportError:
+    DBus = None
+
+# Optional: faster JSON serialization for webhook bodies
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 load_dotenv()
 
 # Configure logging
@@ -35,6 +52,26 @@ logging.basicConfig(
     ]
 )
 
+# JSON helpers
+def _json_dumps(payload: Any) -> str:
+    """Serialize a payload compactly, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(payload).decode()
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+def _json_template(payload: Dict[str, Any]) -> str:
+    """Serialize a payload once into a str.format_map template, keeping {name} placeholders"""
+    body = _json_dumps(payload).replace("{", "{{").replace("}", "}}")
+    return re.sub(r"\{\{(\w+)\}\}", r"{\1}", body)
+
+def _render_json(template: str, **values: Any) -> bytes:
+    """Fill a JSON template, escaping each value as the contents of a JSON string"""
+    return template.format_map({key: _json_dumps(str(value))[1:-1] for key, value in values.items()}).encode()
+
+def _format_timestamps(timestamps: List[float], fmt: str = "%Y-%m-%d %H:%M:%S") -> str:
+    """Render epoch timestamps in local time, one per line"""
+    return "\n".join(time.strftime(fmt, time.localtime(t)) for t in timestamps)
+
 # Enums and Data Classes
 class EventType(Enum):
     CHECK = "check"
@@ -46,21 +83,22 @@ class NotificationType(Enum):
     SLACK = "slack"
     TEAMS = "teams"
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ServiceEvent:
     service_name: str
     event_type: EventType
     success: bool
-    timestamp: datetime
+    # Seconds since the epoch; only formatted for display or converted for MongoDB
+    timestamp: float = field(default_factory=time.time)
     message: Optional[str] = None
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class NotificationConfig:
     notification_type: NotificationType
     enabled: bool
     config: Dict[str, Any]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DatabaseConfig:
     db_type: str
     enabled: bool
@@ -73,34 +111,72 @@ class ServiceChecker(ABC):
     @abstractmethod
     def is_service_running(self, service_name: str) -> bool:
         pass
+    
+    def are_services_running(self, service_names: List[str]) -> Dict[str, bool]:
+        """Check several services at once; implementations may batch this"""
+        return {name: self.is_service_running(name) for name in service_names}
+    
+    def get_service_state(self, service_name: str) -> str:
+        """Return the service state, e.g. "active", "activating" or "failed" """
+        return "active" if self.is_service_running(service_name) else "inactive"
+    
+    def close(self) -> None:
+        """Release any connection held by the checker"""
+        pass
 
 class ServiceManager(ABC):
     """Interface for managing services"""
     
+    # Upper bound on how long a restart may take (systemd's default start timeout is 90s)
+    RESTART_TIMEOUT_SECONDS = 90
+    
     @abstractmethod
     def restart_service(self, service_name: str) -> bool:
         pass
+    
+    def close(self) -> None:
+        """Release any connection held by the manager"""
+        pass
 
 class NotificationSender(ABC):
     """Interface for sending notifications"""
     
     @abstractmethod
-    def send_notification(self, service_name: str, failures: List[datetime], config: Dict[str, Any]) -> bool:
+    def send_notification(self, service_name: str, failures: List[float], config: Dict[str, Any]) -> bool:
         pass
+    
+    def send_batch_notification(self, alerts: List[Tuple[str, List[float]]], config: Dict[str, Any]) -> bool:
+        """Send alerts for several services; implementations may combine them into one message"""
+        results = [self.send_notification(service_name, failures, config) for service_name, failures in alerts]
+        return all(results)
 
 class DatabaseRepository(ABC):
     """Interface for database operations"""
     
+    # Preference when reading failure history (lower is faster); None if reads are not supported
+    QUERY_PRIORITY: Optional[int] = None
+    
     @abstractmethod
     def save_event(self, event: ServiceEvent) -> bool:
         pass
     
+    def save_events_batch(self, events: List[ServiceEvent]) -> bool:
+        """Save several events; implementations may write them in a single round trip"""
+        results = [self.save_event(event) for event in events]
+        return all(results)
+    
     @abstractmethod
-    def get_failures(self, service_name: str, since: datetime) -> List[datetime]:
+    def get_failures(self, service_name: str, since: float) -> List[float]:
+        """Return the epoch timestamps of failures at or after `since`"""
         pass
     
     @abstractmethod
-    def cleanup_old_records(self, cutoff_time: datetime) -> None:
+    def cleanup_old_records(self, cutoff_time: float) -> None:
+        """Delete records older than the epoch timestamp `cutoff_time`"""
+        pass
+    
+    def close(self) -> None:
+        """Flush pending writes and release connections"""
         pass
 
 # Concrete Implementations
@@ -110,6 +186,9 @@ class SystemdServiceChecker(ServiceChecker):
     """Concrete implementation for checking systemd services"""
     
     def is_service_running(self, service_name: str) -> bool:
+        return self.are_services_running([service_name])[service_name]
+    
+    def get_service_state(self, service_name: str) -> str:
         try:
             result = subprocess.run(
                 ["systemctl", "is-active", service_name],
@@ -117,13 +196,99 @@ class SystemdServiceChecker(ServiceChecker):
                 text=True,
                 check=False
             )
-            return result.stdout.strip() == "active"
+            return result.stdout.strip() or "unknown"
         except FileNotFoundError:
             logging.error("systemctl command not found. Are you running in a systemd-enabled environment?")
-            return False
+            return "unknown"
         except Exception as e:
             logging.error(f"Error checking service {service_name}: {e}")
-            return False
+            return "unknown"
+    
+    def are_services_running(self, service_names: List[str]) -> Dict[str, bool]:
+        """Check all services with a single systemctl call"""
+        if not service_names:
+            return {}
+        
+        try:
+            # systemctl prints one state per unit, in the order the units were given
+            result = subprocess.run(
+                ["systemctl", "is-active", *service_names],
+                capture_output=True,
+                text=True,
+                check=False
+            )
+            states = result.stdout.splitlines()
+            if len(states) != len(service_names):
+                # e.g. an invalid unit name makes systemctl fail before printing any state;
+                # check one by one so only the offending unit is reported down
+                logging.error(f"Unexpected systemctl output for services {', '.join(service_names)}: {result.stdout!r} {result.stderr!r}")
+                return {name: self.get_service_state(name) == "active" for name in service_names}
+            return {name: state.strip() == "active" for name, state in zip(service_names, states)}
+        except FileNotFoundError:
+            logging.error("systemctl command not found. Are you running in a systemd-enabled environment?")
+            return {name: False for name in service_names}
+        except Exception as e:
+            logging.error(f"Error checking services {', '.join(service_names)}: {e}")
+            return {name: False for name in service_names}
+
+def _unit_name(service_name: str) -> str:
+    """Return the full systemd unit name for a service (e.g. nginx -> nginx.service)"""
+    return service_name if "." in service_name else f"{service_name}.service"
+
+class DBusServiceChecker(SystemdServiceChecker):
+    """Checks systemd services over a persistent DBus connection, falling back to systemctl"""
+    
+    def __init__(self):
+        self._bus = None
+        self._units: Dict[str, Any] = {}
+        self._dbus_available = DBus is not None
+        # Checks run from several scan threads; the bus connection must not be shared concurrently
+        self._lock = threading.Lock()
+    
+    def _unit(self, service_name: str):
+        # Unit objects are loaded once per service and reused across scans
+        unit = self._units.get(service_name)
+        if unit is None:
+            if self._bus is None:
+                self._bus = DBus()
+                self._bus.open()
+            unit = SystemdUnit(_unit_name(service_name).encode(), bus=self._bus)
+            unit.load()
+            self._units[service_name] = unit
+        return unit
+    
+    def are_services_running(self, service_names: List[str]) -> Dict[str, bool]:
+        if not self._dbus_available:
+            return super().are_services_running(service_names)
+        
+        try:
+            with self._lock:
+                return {name: self._unit(name).Unit.ActiveState == b"active" for name in service_names}
+        except Exception as e:
+            # No usable system bus (e.g. inside a container); stop trying and use systemctl
+            logging.warning(f"systemd DBus check failed, falling back to systemctl: {e}")
+            self._dbus_available = False
+            self.close()
+            return super().are_services_running(service_names)
+    
+    def get_service_state(self, service_name: str) -> str:
+        if not self._dbus_available:
+            return super().get_service_state(service_name)
+        
+        try:
+            with self._lock:
+                return self._unit(service_name).Unit.ActiveState.decode()
+        except Exception as e:
+            logging.warning(f"systemd DBus check failed, falling back to systemctl: {e}")
+            self._dbus_available = False
+            self.close()
+            return super().get_service_state(service_name)
+    
+    def close(self) -> None:
+        self._units.clear()
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
 
 # Service Manager Implementation
 class SystemdServiceManager(ServiceManager):
@@ -135,7 +300,8 @@ class SystemdServiceManager(ServiceManager):
                 ["systemctl", "restart", service_name],
                 capture_output=True,
                 text=True,
-                check=False
+                check=False,
+                timeout=self.RESTART_TIMEOUT_SECONDS
             )
             success = result.returncode == 0
             if success:
@@ -146,15 +312,84 @@ class SystemdServiceManager(ServiceManager):
         except FileNotFoundError:
             logging.error("systemctl command not found. Cannot restart service.")
             return False
+        except subprocess.TimeoutExpired:
+            logging.error(f"Timed out after {self.RESTART_TIMEOUT_SECONDS}s restarting service {service_name}")
+            return False
         except Exception as e:
             logging.error(f"Error restarting service {service_name}: {e}")
             return False
 
+class DBusServiceManager(SystemdServiceManager):
+    """Restarts systemd services over a persistent DBus connection, falling back to systemctl"""
+    
+    def __init__(self):
+        self._bus = None
+        self._manager = None
+        self._dbus_available = DBus is not None
+        # Restarts run from several scan threads; the bus connection must not be shared concurrently
+        self._lock = threading.Lock()
+    
+    @property
+    def manager(self):
+        if self._manager is None:
+            self._bus = DBus()
+            self._bus.open()
+            self._manager = SystemdManager(bus=self._bus)
+            self._manager.load()
+        return self._manager
+    
+    def restart_service(self, service_name: str) -> bool:
+        if self._dbus_available:
+            with self._lock:
+                restarted = self._restart_over_dbus(service_name)
+            if restarted is not None:
+                return restarted
+        return super().restart_service(service_name)
+    
+    def _restart_over_dbus(self, service_name: str) -> Optional[bool]:
+        """Restart a unit over DBus; returns None if the bus is unusable and systemctl should be used"""
+        try:
+            manager = self.manager
+        except Exception as e:
+            # No usable system bus (e.g. inside a container); stop trying and use systemctl
+            logging.warning(f"systemd DBus connection failed, falling back to systemctl: {e}")
+            self._dbus_available = False
+            self.close()
+            return None
+        
+        try:
+            # Like systemctl --no-block, this returns once the restart job is queued
+            manager.Manager.RestartUnit(_unit_name(service_name).encode(), b"replace")
+            logging.info(f"Successfully restarted service {service_name}")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to restart service {service_name}: {e}")
+            return False
+    
+    def close(self) -> None:
+        self._manager = None
+        if self._bus is not None:
+            self._bus.close()
+            self._bus = None
+
 # Notification Senders
 class EmailNotificationSender(NotificationSender):
     """Email notification sender"""
     
-    def send_notification(self, service_name: str, failures: List[datetime], config: Dict[str, Any]) -> bool:
+    SUBJECT_TEMPLATE = "ALERT: Service {service} has failed multiple times"
+    BODY_TEMPLATE = (
+        "The service {service} has failed {count} times recently.\n"
+        "\n"
+        "Failure timestamps:\n"
+        "{timestamps}\n"
+        "\n"
+        "Please check the system manually.\n"
+        "\n"
+        "--\n"
+        "Linux Service Doctor\n"
+    )
+    
+    def send_notification(self, service_name: str, failures: List[float], config: Dict[str, Any]) -> bool:
         if not config.get("password"):
             logging.debug("Email password missing.")
             return False
@@ -163,19 +398,45 @@ class EmailNotificationSender(NotificationSender):
             msg = MIMEMultipart()
             msg["From"] = config["sender_email"]
             msg["To"] = config["receiver_email"]
-            msg["Subject"] = f"ALERT: Service {service_name} has failed multiple times"
+            msg["Subject"] = self.SUBJECT_TEMPLATE.format(service=service_name)
             
-            body = f"""
-            The service {service_name} has failed {len(failures)} times recently.
+            body = self.BODY_TEMPLATE.format(
+                service=service_name,
+                count=len(failures),
+                timestamps=_format_timestamps(failures)
+            )
             
-            Failure timestamps:
-            {chr(10).join([t.strftime('%Y-%m-%d %H:%M:%S') for t in failures])}
+            msg.attach(MIMEText(body, "plain"))
             
-            Please check the system manually.
+            with smtplib.SMTP(config["smtp_server"], config["smtp_port"]) as server:
+                server.starttls()
+                server.login(config["sender_email"], config["password"])
+                server.send_message(msg)
             
-            --
-            Linux Service Doctor
-            """
+            logging.info(f"Email alert sent for service {service_name}")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to send email alert for service {service_name}: {e}")
+            return False
+    
+    def send_batch_notification(self, alerts: List[Tuple[str, List[float]]], config: Dict[str, Any]) -> bool:
+        if not config.get("password"):
+            logging.debug("Email password missing.")
+            return False
+        
+        service_names = ", ".join(service_name for service_name, _ in alerts)
+        try:
+            msg = MIMEMultipart()
+            msg["From"] = config["sender_email"]
+            msg["To"] = config["receiver_email"]
+            msg["Subject"] = f"ALERT: {len(alerts)} services have failed multiple times"
+            
+            sections = []
+            for service_name, failures in alerts:
+                timestamps = _format_timestamps(failures)
+                sections.append(f"The service {service_name} has failed {len(failures)} times recently.\n"
+                                f"Failure timestamps:\n{timestamps}")
+            body = "\n\n".join(sections) + "\n\nPlease check the system manually.\n\n--\nLinux Service Doctor\n"
             
             msg.attach(MIMEText(body, "plain"))
             
@@ -184,42 +445,65 @@ class EmailNotificationSender(NotificationSender):
                 server.login(config["sender_email"], config["password"])
                 server.send_message(msg)
             
-            logging.info(f"Email alert sent for service {service_name}")
+            logging.info(f"Email alert sent for services {service_names}")
             return True
         except Exception as e:
-            logging.error(f"Failed to send email alert for service {service_name}: {e}")
+            logging.error(f"Failed to send email alert for services {service_names}: {e}")
             return False
 
-class SlackNotificationSender(NotificationSender):
+class WebhookNotificationSender(NotificationSender):
+    """Base class for senders that post JSON to a webhook over a pooled HTTP session"""
+    
+    TIMEOUT_SECONDS = 5
+    HEADERS = {"Content-Type": "application/json"}
+    
+    def __init__(self):
+        # Keep-alive connections are reused across alerts to the same webhook host
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+    
+    def _post(self, webhook_url: str, body: bytes) -> requests.Response:
+        """Post an already serialized JSON body"""
+        return self._session.post(webhook_url, data=body, headers=self.HEADERS, timeout=self.TIMEOUT_SECONDS)
+
+class SlackNotificationSender(WebhookNotificationSender):
     """Slack notification sender"""
     
-    def send_notification(self, service_name: str, failures: List[datetime], config: Dict[str, Any]) -> bool:
+    # Serialized once; each alert only substitutes the placeholders
+    TEMPLATE = _json_template({
+        "text": "🚨 *ALERT*: Service `{service}` has failed multiple times",
+        "blocks": [
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "🚨 *ALERT*: Service `{service}` has failed {count} times recently."
+                }
+            },
+            {
+                "type": "section",
+                "text": {
+                    "type": "mrkdwn",
+                    "text": "*Failure timestamps:*\n{timestamps}"
+                }
+            }
+        ]
+    })
+    
+    def send_notification(self, service_name: str, failures: List[float], config: Dict[str, Any]) -> bool:
         if not config.get("webhook_url"):
             logging.debug("Slack webhook URL missing.")
             return False
         
         try:
-            message = {
-                "text": f"🚨 *ALERT*: Service `{service_name}` has failed multiple times",
-                "blocks": [
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"🚨 *ALERT*: Service `{service_name}` has failed {len(failures)} times recently."
-                        }
-                    },
-                    {
-                        "type": "section",
-                        "text": {
-                            "type": "mrkdwn",
-                            "text": f"*Failure timestamps:*\n" + "\n".join([t.strftime('• %Y-%m-%d %H:%M:%S') for t in failures])
-                        }
-                    }
-                ]
-            }
+            body = _render_json(
+                self.TEMPLATE,
+                service=service_name,
+                count=len(failures),
+                timestamps=_format_timestamps(failures, '• %Y-%m-%d %H:%M:%S')
+            )
             
-            response = requests.post(config["webhook_url"], json=message)
+            response = self._post(config["webhook_url"], body)
             if response.status_code == 200:
                 logging.info(f"Slack alert sent for service {service_name}")
                 return True
@@ -229,126 +513,264 @@ class SlackNotificationSender(NotificationSender):
         except Exception as e:
             logging.error(f"Failed to send Slack alert for service {service_name}: {e}")
             return False
+    
+    def send_batch_notification(self, alerts: List[Tuple[str, List[float]]], config: Dict[str, Any]) -> bool:
+        if not config.get("webhook_url"):
+            logging.debug("Slack webhook URL missing.")
+            return False
+        
+        service_names = ", ".join(service_name for service_name, _ in alerts)
+        try:
+            blocks = []
+            for service_name, failures in alerts:
+                blocks.append({
+                    "type": "section",
+                    "text": {
+                        "type": "mrkdwn",
+                        "text": f"🚨 *ALERT*: Service `{service_name}` has failed {len(failures)} times recently.\n"
+                                + _format_timestamps(failures, '• %Y-%m-%d %H:%M:%S')
+                    }
+                })
+            message = {
+                "text": f"🚨 *ALERT*: {len(alerts)} services have failed multiple times",
+                "blocks": blocks
+            }
+            
+            response = self._post(config["webhook_url"], _json_dumps(message).encode())
+            if response.status_code == 200:
+                logging.info(f"Slack alert sent for services {service_names}")
+                return True
+            else:
+                logging.error(f"Failed to send Slack alert: {response.status_code} - {response.text}")
+                return False
+        except Exception as e:
+            logging.error(f"Failed to send Slack alert for services {service_names}: {e}")
+            return False
 
-class TeamsNotificationSender(NotificationSender):
+class TeamsNotificationSender(WebhookNotificationSender):
     """Microsoft Teams notification sender"""
     
-    def send_notification(self, service_name: str, failures: List[datetime], config: Dict[str, Any]) -> bool:
+    # Serialized once; each alert only substitutes the placeholders
+    TEMPLATE = _json_template({
+        "@type": "MessageCard",
+        "@context": "http://schema.org/extensions",
+        "summary": "ALERT: Service {service} has failed multiple times",
+        "sections": [{
+            "activityTitle": "Service Failure Alert: {service}",
+            "activitySubtitle": "Failed {count} times recently",
+            "facts": [{
+                "name": "Failure Timestamps",
+                "value": "{timestamps}"
+            }],
+            "text": "Please check the system manually."
+        }],
+        "themeColor": "FF0000"
+    })
+    
+    def send_notification(self, service_name: str, failures: List[float], config: Dict[str, Any]) -> bool:
+        if not config.get("webhook_url"):
+            logging.debug("Teams webhook URL missing.")
+            return False
+        
+        try:
+            body = _render_json(
+                self.TEMPLATE,
+                service=service_name,
+                count=len(failures),
+                timestamps=_format_timestamps(failures)
+            )
+            
+            response = self._post(config["webhook_url"], body)
+            if response.status_code == 200:
+                logging.info(f"Teams alert sent for service {service_name}")
+                return True
+            else:
+                logging.error(f"Failed to send Teams alert: {response.status_code} - {response.text}")
+                return False
+        except Exception as e:
+            logging.error(f"Failed to send Teams alert for service {service_name}: {e}")
+            return False
+    
+    def send_batch_notification(self, alerts: List[Tuple[str, List[float]]], config: Dict[str, Any]) -> bool:
         if not config.get("webhook_url"):
             logging.debug("Teams webhook URL missing.")
             return False
         
+        service_names = ", ".join(service_name for service_name, _ in alerts)
         try:
             message = {
                 "@type": "MessageCard",
                 "@context": "http://schema.org/extensions",
-                "summary": f"ALERT: Service {service_name} has failed multiple times",
+                "summary": f"ALERT: {len(alerts)} services have failed multiple times",
                 "sections": [{
                     "activityTitle": f"Service Failure Alert: {service_name}",
                     "activitySubtitle": f"Failed {len(failures)} times recently",
                     "facts": [{
                         "name": "Failure Timestamps",
-                        "value": "\n".join([t.strftime('%Y-%m-%d %H:%M:%S') for t in failures])
-                    }],
-                    "text": "Please check the system manually."
-                }],
+                        "value": _format_timestamps(failures)
+                    }]
+                } for service_name, failures in alerts] + [{"text": "Please check the system manually."}],
                 "themeColor": "FF0000"
             }
             
-            response = requests.post(config["webhook_url"], json=message)
+            response = self._post(config["webhook_url"], _json_dumps(message).encode())
             if response.status_code == 200:
-                logging.info(f"Teams alert sent for service {service_name}")
+                logging.info(f"Teams alert sent for services {service_names}")
                 return True
             else:
                 logging.error(f"Failed to send Teams alert: {response.status_code} - {response.text}")
                 return False
         except Exception as e:
-            logging.error(f"Failed to send Teams alert for service {service_name}: {e}")
+            logging.error(f"Failed to send Teams alert for services {service_names}: {e}")
             return False
 
 # Database Repositories
+# Each client library is imported on first use, so only enabled databases are loaded
 class InfluxDBRepository(DatabaseRepository):
     """InfluxDB repository implementation"""
     
+    # influxdb_client.Point and WritePrecision, resolved once by the write_api property
+    _Point = None
+    _WritePrecision = None
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self._client = None
+        self._write_api = None
+        # Scan threads may save events concurrently; only one client and writer must ever be created
+        self._init_lock = threading.RLock()
     
     @property
     def client(self):
         if self._client is None:
-            self._client = InfluxDBClient(
-                url=self.config["url"],
-                token=self.config["token"],
-                org=self.config["org"]
-            )
+            with self._init_lock:
+                if self._client is None:
+                    from influxdb_client import InfluxDBClient
+                    self._client = InfluxDBClient(
+                        url=self.config["url"],
+                        token=self.config["token"],
+                        org=self.config["org"]
+                    )
         return self._client
     
+    @property
+    def write_api(self):
+        # Points are buffered and flushed in the background in batches
+        if self._write_api is None:
+            with self._init_lock:
+                if self._write_api is None:
+                    from influxdb_client import Point, WritePrecision
+                    from influxdb_client.client.write_api import WriteOptions
+                    InfluxDBRepository._Point = Point
+                    InfluxDBRepository._WritePrecision = WritePrecision
+                    self._write_api = self.client.write_api(
+                        write_options=WriteOptions(batch_size=500, flush_interval=10_000)
+                    )
+        return self._write_api
+    
+    @classmethod
+    def _to_point(cls, event: ServiceEvent):
+        # Only called after write_api has resolved the influxdb_client names
+        return cls._Point("service_events") \
+            .tag("service", event.service_name) \
+            .tag("event_type", event.event_type.value) \
+            .field("success", event.success) \
+            .field("value", 1 if event.event_type != EventType.CHECK else (1 if event.success else 0)) \
+            .time(int(event.timestamp * 1_000_000_000), cls._WritePrecision.NS)
+    
     def save_event(self, event: ServiceEvent) -> bool:
         try:
-            write_api = self.client.write_api(write_options=SYNCHRONOUS)
-            
-            point = Point("service_events") \
-                .tag("service", event.service_name) \
-                .tag("event_type", event.event_type.value) \
-                .field("success", event.success) \
-                .field("value", 1 if event.event_type != EventType.CHECK else (1 if event.success else 0)) \
-                .time(event.timestamp, WritePrecision.NS)
-            
-            write_api.write(bucket=self.config["bucket"], record=point)
-            logging.debug(f"Saved {event.event_type.value} event for {event.service_name} to InfluxDB")
+            write_api = self.write_api
+            write_api.write(bucket=self.config["bucket"], record=self._to_point(event))
+            logging.debug(f"Queued {event.event_type.value} event for {event.service_name} to InfluxDB")
             return True
         except Exception as e:
             logging.error(f"Failed to save event to InfluxDB: {e}")
             return False
     
-    def get_failures(self, service_name: str, since: datetime) -> List[datetime]:
+    def save_events_batch(self, events: List[ServiceEvent]) -> bool:
+        try:
+            write_api = self.write_api
+            write_api.write(bucket=self.config["bucket"], record=[self._to_point(event) for event in events])
+            logging.debug(f"Queued {len(events)} events to InfluxDB")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to save events to InfluxDB: {e}")
+            return False
+    
+    def get_failures(self, service_name: str, since: float) -> List[float]:
         # InfluxDB query implementation would go here
         # For now, returning empty list as this requires complex query logic
         return []
     
-    def cleanup_old_records(self, cutoff_time: datetime) -> None:
+    def cleanup_old_records(self, cutoff_time: float) -> None:
         # InfluxDB cleanup logic would go here
         pass
+    
+    def close(self) -> None:
+        if self._write_api is not None:
+            self._write_api.close()
+            self._write_api = None
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
 class RedisRepository(DatabaseRepository):
     """Redis repository implementation"""
     
+    QUERY_PRIORITY = 0
+    
+    # Maximum number of commands queued on a pipeline before it is sent
+    PIPELINE_FLUSH_SIZE = 500
+    # Keys requested per SCAN cursor step
+    SCAN_COUNT = 500
+    # Approximate cap on the entries kept in each stream
+    STREAM_MAXLEN = 10_000
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self._client = None
+        # Scan threads may save events concurrently; only one client must ever be created
+        self._init_lock = threading.Lock()
     
     @property
     def client(self):
         if self._client is None:
-            self._client = redis.Redis(
-                host=self.config.get("host", "localhost"),
-                port=self.config.get("port", 6379),
-                password=self.config.get("password"),
-                decode_responses=True
-            )
+            with self._init_lock:
+                if self._client is None:
+                    import redis
+                    self._client = redis.Redis(
+                        host=self.config.get("host", "localhost"),
+                        port=self.config.get("port", 6379),
+                        password=self.config.get("password"),
+                        decode_responses=True
+                    )
         return self._client
     
+    def _queue_event(self, pipe, event: ServiceEvent) -> None:
+        # The service name is part of the key, so entries only carry the event fields
+        event_data = {
+            "event_type": event.event_type.value,
+            "success": int(event.success),
+            "timestamp": event.timestamp,
+            "message": event.message or ""
+        }
+        
+        # Streams are keyed by insertion time, which gives time-range queries without JSON
+        key = f"stream:service_events:{event.service_name}"
+        pipe.xadd(key, event_data, maxlen=self.STREAM_MAXLEN, approximate=True)
+        
+        # Also store failures in a separate stream for quick access
+        if event.event_type == EventType.FAILURE:
+            failure_key = f"stream:service_failures:{event.service_name}"
+            pipe.xadd(failure_key, {"timestamp": event_data["timestamp"]}, maxlen=self.STREAM_MAXLEN, approximate=True)
+    
     def save_event(self, event: ServiceEvent) -> bool:
         try:
-            event_data = {
-                "service_name": event.service_name,
-                "event_type": event.event_type.value,
-                "success": event.success,
-                "timestamp": event.timestamp.isoformat(),
-                "message": event.message or ""
-            }
-            
-            # Store in a sorted set for easy time-based queries
-            key = f"service_events:{event.service_name}"
-            score = event.timestamp.timestamp()
-            
-            self.client.zadd(key, {json.dumps(event_data): score})
-            
-            # Also store failures in a separate key for quick access
-            if event.event_type == EventType.FAILURE:
-                failure_key = f"service_failures:{event.service_name}"
-                self.client.zadd(failure_key, {event.timestamp.isoformat(): score})
+            # All writes for the event go out in a single round trip
+            pipe = self.client.pipeline(transaction=False)
+            self._queue_event(pipe, event)
+            pipe.execute()
             
             logging.debug(f"Saved {event.event_type.value} event for {event.service_name} to Redis")
             return True
@@ -356,45 +778,143 @@ class RedisRepository(DatabaseRepository):
             logging.error(f"Failed to save event to Redis: {e}")
             return False
     
-    def get_failures(self, service_name: str, since: datetime) -> List[datetime]:
+    def save_events_batch(self, events: List[ServiceEvent]) -> bool:
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for event in events:
+                self._queue_event(pipe, event)
+                if len(pipe) >= self.PIPELINE_FLUSH_SIZE:
+                    pipe.execute()
+            pipe.execute()
+            
+            logging.debug(f"Saved {len(events)} events to Redis")
+            return True
+        except Exception as e:
+            logging.error(f"Failed to save events to Redis: {e}")
+            return False
+    
+    def get_failures(self, service_name: str, since: float) -> List[float]:
         try:
-            key = f"service_failures:{service_name}"
-            since_timestamp = since.timestamp()
+            key = f"stream:service_failures:{service_name}"
+            since_id = int(since * 1000)
             
-            # Get failures since the specified time
-            failure_timestamps = self.client.zrangebyscore(key, since_timestamp, "+inf")
-            return [datetime.fromisoformat(ts) for ts in failure_timestamps]
+            # Get failures since the specified time; stream ids start with the epoch in milliseconds
+            entries = self.client.xrange(key, min=since_id, max="+")
+            return [float(fields["timestamp"]) for _, fields in entries]
         except Exception as e:
             logging.error(f"Failed to get failures from Redis: {e}")
             return []
     
-    def cleanup_old_records(self, cutoff_time: datetime) -> None:
+    def cleanup_old_records(self, cutoff_time: float) -> None:
         try:
-            cutoff_timestamp = cutoff_time.timestamp()
-            
-            # Get all service failure keys
-            failure_keys = self.client.keys("service_failures:*")
-            event_keys = self.client.keys("service_events:*")
+            cutoff_id = int(cutoff_time * 1000)
             
-            for key in failure_keys + event_keys:
-                self.client.zremrangebyscore(key, "-inf", cutoff_timestamp)
+            # MAXLEN already caps each stream; this applies the time-based retention on top.
+            # Walk the keys with SCAN (KEYS blocks the server) and queue the trims on a pipeline
+            pipe = self.client.pipeline(transaction=False)
+            for pattern in ("stream:service_failures:*", "stream:service_events:*"):
+                for key in self.client.scan_iter(match=pattern, count=self.SCAN_COUNT):
+                    pipe.xtrim(key, minid=cutoff_id, approximate=True)
+                    if len(pipe) >= self.PIPELINE_FLUSH_SIZE:
+                        pipe.execute()
+            pipe.execute()
             
             logging.debug(f"Cleaned up old records before {cutoff_time}")
         except Exception as e:
             logging.error(f"Failed to cleanup old records in Redis: {e}")
 
+# How often an idle MongoDB writer checks that its parent process is still running
+MONGO_WRITER_PARENT_CHECK_SECONDS = 1.0
+
+def _mongo_writer_loop(config: Dict[str, Any], events: multiprocessing.Queue, batch_size: int, flush_interval: float):
+    """Writer process body: insert queued lists of event documents into MongoDB in batches"""
+    # Ctrl-C reaches the whole process group; the parent shuts the writer down through the
+    # sentinel so buffered documents are flushed first. SIGTERM keeps its default action,
+    # which multiprocessing relies on to stop a writer that did not exit on its own.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    parent = multiprocessing.parent_process()
+    
+    connection_string = config.get("connection_string", "mongodb://localhost:27017")
+    db_name = config.get("database", "service_doctor")
+    import pymongo
+    collection = pymongo.MongoClient(connection_string)[db_name].service_events
+    
+    buffer = []
+    deadline = None
+    
+    def flush():
+        if not buffer:
+            return
+        try:
+            collection.insert_many(buffer, ordered=False)
+            logging.debug(f"Saved {len(buffer)} events to MongoDB")
+        except Exception as e:
+            logging.error(f"Failed to save {len(buffer)} events to MongoDB: {e}")
+        buffer.clear()
+    
+    while True:
+        timeout = MONGO_WRITER_PARENT_CHECK_SECONDS
+        if deadline is not None:
+            timeout = max(0, min(timeout, deadline - time.monotonic()))
+        try:
+            event_docs = events.get(timeout=timeout)
+        except queue.Empty:
+            if deadline is not None and time.monotonic() >= deadline:
+                flush()
+                deadline = None
+            # The parent died without sending the sentinel (e.g. killed); don't outlive it
+            if parent is not None and not parent.is_alive():
+                flush()
+                return
+            continue
+        
+        # None is the shutdown sentinel sent by MongoDBRepository.close
+        if event_docs is None:
+            flush()
+            return
+        
+        buffer.extend(event_docs)
+        if deadline is None:
+            deadline = time.monotonic() + flush_interval
+        if len(buffer) >= batch_size:
+            flush()
+            deadline = None
+
 class MongoDBRepository(DatabaseRepository):
     """MongoDB repository implementation"""
     
+    QUERY_PRIORITY = 1
+    
+    BATCH_SIZE = 100
+    FLUSH_INTERVAL_SECONDS = 1.0
+    QUEUE_MAX_SIZE = 10_000
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
         self._client = None
         self._db = None
+        
+        # Inserts are handed to a separate writer process so the scan never waits on MongoDB.
+        # "spawn" gives the writer a fresh interpreter, as pymongo clients are not fork-safe.
+        context = multiprocessing.get_context("spawn")
+        self._events = context.Queue(maxsize=self.QUEUE_MAX_SIZE)
+        self._writer = context.Process(
+            target=_mongo_writer_loop,
+            args=(config, self._events, self.BATCH_SIZE, self.FLUSH_INTERVAL_SECONDS),
+            name="mongo-writer",
+            daemon=True
+        )
+        self._writer.start()
+        
+        # Registered after multiprocessing's own exit hook, so this runs first: the writer is
+        # flushed and joined even if the parent exits without calling close()
+        atexit.register(self.close)
     
     @property
     def client(self):
         if self._client is None:
             connection_string = self.config.get("connection_string", "mongodb://localhost:27017")
+            import pymongo
             self._client = pymongo.MongoClient(connection_string)
         return self._client
     
@@ -405,48 +925,105 @@ class MongoDBRepository(DatabaseRepository):
             self._db = self.client[db_name]
         return self._db
     
+    @staticmethod
+    def _to_document(event: ServiceEvent) -> Dict[str, Any]:
+        return {
+            "service_name": event.service_name,
+            "event_type": event.event_type.value,
+            "success": event.success,
+            # Stored as a BSON date so the collection stays queryable by time
+            "timestamp": datetime.fromtimestamp(event.timestamp),
+            "message": event.message or ""
+        }
+    
     def save_event(self, event: ServiceEvent) -> bool:
+        if not self._writer.is_alive():
+            logging.error("Failed to save event to MongoDB: writer process is not running")
+            return False
+        
         try:
-            collection = self.db.service_events
-            
-            event_doc = {
-                "service_name": event.service_name,
-                "event_type": event.event_type.value,
-                "success": event.success,
-                "timestamp": event.timestamp,
-                "message": event.message or ""
-            }
-            
-            collection.insert_one(event_doc)
-            logging.debug(f"Saved {event.event_type.value} event for {event.service_name} to MongoDB")
+            self._events.put_nowait([self._to_document(event)])
+            logging.debug(f"Queued {event.event_type.value} event for {event.service_name} to MongoDB")
             return True
+        except queue.Full:
+            logging.error("Failed to save event to MongoDB: writer queue is full")
+            return False
         except Exception as e:
             logging.error(f"Failed to save event to MongoDB: {e}")
             return False
     
-    def get_failures(self, service_name: str, since: datetime) -> List[datetime]:
+    def save_events_batch(self, events: List[ServiceEvent]) -> bool:
+        if not self._writer.is_alive():
+            logging.error("Failed to save events to MongoDB: writer process is not running")
+            return False
+        
+        try:
+            # One queue item per batch, so the writer receives the whole scan in one insert_many
+            self._events.put_nowait([self._to_document(event) for event in events])
+            logging.debug(f"Queued {len(events)} events to MongoDB")
+            return True
+        except queue.Full:
+            logging.error("Failed to save events to MongoDB: writer queue is full")
+            return False
+        except Exception as e:
+            logging.error(f"Failed to save events to MongoDB: {e}")
+            return False
+    
+    def get_failures(self, service_name: str, since: float) -> List[float]:
         try:
             collection = self.db.service_events
             
             query = {
                 "service_name": service_name,
                 "event_type": EventType.FAILURE.value,
-                "timestamp": {"$gte": since}
+                "timestamp": {"$gte": datetime.fromtimestamp(since)}
             }
             
             failures = collection.find(query, {"timestamp": 1})
-            return [doc["timestamp"] for doc in failures]
+            return [doc["timestamp"].timestamp() for doc in failures]
         except Exception as e:
             logging.error(f"Failed to get failures from MongoDB: {e}")
             return []
     
-    def cleanup_old_records(self, cutoff_time: datetime) -> None:
+    def cleanup_old_records(self, cutoff_time: float) -> None:
         try:
             collection = self.db.service_events
-            result = collection.delete_many({"timestamp": {"$lt": cutoff_time}})
+            result = collection.delete_many({"timestamp": {"$lt": datetime.fromtimestamp(cutoff_time)}})
             logging.debug(f"Cleaned up {result.deleted_count} old records before {cutoff_time}")
         except Exception as e:
             logging.error(f"Failed to cleanup old records in MongoDB: {e}")
+    
+    def close(self) -> None:
+        if self._writer.is_alive():
+            self._events.put(None)
+            self._writer.join(timeout=10)
+            if self._writer.is_alive():
+                logging.error("MongoDB writer did not stop in time, terminating it")
+                self._writer.terminate()
+                self._writer.join(timeout=5)
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+# Alert Batching
+class AlertBatcher:
+    """Collects alerts over a time window so each channel receives one combined message"""
+    
+    def __init__(self):
+        self._pending: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+    
+    def add(self, service_name: str, failures: List[float]) -> None:
+        """Queue an alert; a later alert for the same service replaces the earlier one"""
+        with self._lock:
+            self._pending[service_name] = list(failures)
+    
+    def drain(self) -> List[Tuple[str, List[float]]]:
+        """Return and clear all queued alerts"""
+        with self._lock:
+            alerts = list(self._pending.items())
+            self._pending.clear()
+        return alerts
 
 # Factory Classes
 class NotificationSenderFactory:
@@ -458,12 +1035,21 @@ class NotificationSenderFactory:
         NotificationType.TEAMS: TeamsNotificationSender,
     }
     
+    # Senders are created once per type and reused, so they can keep connections open
+    _instances: Dict[NotificationType, NotificationSender] = {}
+    _instances_lock = threading.Lock()
+    
     @classmethod
     def create_sender(cls, notification_type: NotificationType) -> NotificationSender:
+        sender = cls._instances.get(notification_type)
+        if sender is not None:
+            return sender
+        
         sender_class = cls._senders.get(notification_type)
         if not sender_class:
             raise ValueError(f"Unknown notification type: {notification_type}")
-        return sender_class()
+        with cls._instances_lock:
+            return cls._instances.setdefault(notification_type, sender_class())
 
 class DatabaseRepositoryFactory:
     """Factory for creating database repositories"""
@@ -483,6 +1069,22 @@ class DatabaseRepositoryFactory:
 class ConfigurationManager:
     """Handles loading and managing configuration"""
     
+    # Environment variables that override entries of the "databases" and "notifications"
+    # sections, as (section, entry type, config key, variable name, cast)
+    ENV_OVERRIDES = (
+        ("databases", "influxdb", "url", "INFLUXDB_URL", str),
+        ("databases", "influxdb", "token", "INFLUXDB_TOKEN", str),
+        ("databases", "influxdb", "org", "INFLUXDB_ORG", str),
+        ("databases", "influxdb", "bucket", "INFLUXDB_BUCKET", str),
+        ("databases", "redis", "host", "REDIS_HOST", str),
+        ("databases", "redis", "port", "REDIS_PORT", int),
+        ("databases", "redis", "password", "REDIS_PASSWORD", str),
+        ("databases", "mongodb", "connection_string", "MONGODB_CONNECTION_STRING", str),
+        ("notifications", "email", "password", "EMAIL_PASSWORD", str),
+        ("notifications", "slack", "webhook_url", "SLACK_WEBHOOK_URL", str),
+        ("notifications", "teams", "webhook_url", "TEAMS_WEBHOOK_URL", str),
+    )
+    
     def __init__(self, config_path: str = "config.json"):
         self.config_path = config_path
         self.config = {}
@@ -502,41 +1104,32 @@ class ConfigurationManager:
     
     def _override_with_env_vars(self):
         """Override configuration with environment variables"""
-        # Database configurations
-        for db_config in self.config.get("databases", []):
-            if db_config["type"] == "influxdb":
-                db_config["config"]["url"] = os.getenv("INFLUXDB_URL", db_config["config"].get("url"))
-                db_config["config"]["token"] = os.getenv("INFLUXDB_TOKEN", db_config["config"].get("token"))
-                db_config["config"]["org"] = os.getenv("INFLUXDB_ORG", db_config["config"].get("org"))
-                db_config["config"]["bucket"] = os.getenv("INFLUXDB_BUCKET", db_config["config"].get("bucket"))
-            elif db_config["type"] == "redis":
-                db_config["config"]["host"] = os.getenv("REDIS_HOST", db_config["config"].get("host"))
-                db_config["config"]["port"] = int(os.getenv("REDIS_PORT", db_config["config"].get("port", 6379)))
-                db_config["config"]["password"] = os.getenv("REDIS_PASSWORD", db_config["config"].get("password"))
-            elif db_config["type"] == "mongodb":
-                db_config["config"]["connection_string"] = os.getenv("MONGODB_CONNECTION_STRING", 
-                                                                   db_config["config"].get("connection_string"))
-        
-        # Notification configurations
-        for notif_config in self.config.get("notifications", []):
-            if notif_config["type"] == "email":
-                notif_config["config"]["password"] = os.getenv("EMAIL_PASSWORD", notif_config["config"].get("password"))
-            elif notif_config["type"] == "slack":
-                notif_config["config"]["webhook_url"] = os.getenv("SLACK_WEBHOOK_URL", notif_config["config"].get("webhook_url"))
-            elif notif_config["type"] == "teams":
-                notif_config["config"]["webhook_url"] = os.getenv("TEAMS_WEBHOOK_URL", notif_config["config"].get("webhook_url"))
+        environ = dict(os.environ)
+        for section, entry_type, key, env_var, cast in self.ENV_OVERRIDES:
+            value = environ.get(env_var)
+            if value is None:
+                continue
+            for entry in self.config.get(section, []):
+                if entry["type"] == entry_type:
+                    entry["config"][key] = cast(value)
 
 # Main Service Doctor Class
 class ServiceDoctor:
     """Main service monitoring class that orchestrates all components"""
     
+    # Waits between checks confirming that a restarted service became active; the last one
+    # repeats while systemd still reports the unit as starting
+    RESTART_CONFIRM_DELAYS = (0.1, 0.25, 0.5, 1.0, 2.0)
+    STARTING_STATES = ("activating", "reloading")
+    
     def __init__(self, config_manager: ConfigurationManager):
         self.config_manager = config_manager
         self.config = config_manager.load_config()
         
         # Initialize components
-        self.service_checker = SystemdServiceChecker()
-        self.service_manager = SystemdServiceManager()
+        # Both use DBus when pystemd is installed and fall back to systemctl otherwise
+        self.service_checker = DBusServiceChecker()
+        self.service_manager = DBusServiceManager()
         
         # Initialize databases
         self.databases = []
@@ -554,6 +1147,18 @@ class ServiceDoctor:
                 except Exception as e:
                     logging.error(f"Failed to initialize {db_config.db_type} database: {e}")
         
+        # Writes to the databases are independent network round trips, so issue them in parallel
+        self._io_pool = ThreadPoolExecutor(max_workers=len(self.databases) or 1, thread_name_prefix="db-io")
+        
+        # Services are handled concurrently during a scan (restarts can take seconds each)
+        services = self.config.get("services", [])
+        self._scan_pool = ThreadPoolExecutor(max_workers=min(32, len(services)) or 1, thread_name_prefix="scan")
+        
+        # Failure history is read from a single database, the fastest one that supports queries
+        queryable = [db for db in self.databases if db.QUERY_PRIORITY is not None]
+        self._failure_db = min(queryable, key=lambda db: db.QUERY_PRIORITY, default=None)
+        self._have_db = self._failure_db is not None
+        
         # Initialize notification senders
         self.notification_configs = []
         for notif_config_dict in self.config.get("notifications", []):
@@ -565,60 +1170,90 @@ class ServiceDoctor:
                 )
                 self.notification_configs.append(notif_config)
         
-        # In-memory failure tracking (fallback)
-        self.service_failures = defaultdict(list)
+        # Failures inside the alert window per service, oldest first. Expired entries are
+        # dropped at the start of each scan, so the deque length is the live failure count
+        self.service_failures = defaultdict(deque)
+        self.alert_window_seconds = self.config.get("alert_window_hours", 1) * 3600
+        
+        # Alerts raised within this window are combined into one message per channel (0 disables batching)
+        self.alert_batch_window_seconds = self.config.get("alert_batch_window_seconds", 30)
+        self.alert_batcher = AlertBatcher()
+        
+        # Successful checks are only written on a down->up transition or every Nth healthy scan
+        self.check_heartbeat_scans = max(1, self.config.get("check_heartbeat_scans", 12))
+        self._last_state: Dict[str, bool] = {}
+        self._healthy_scans: Dict[str, int] = defaultdict(int)
+        
+        # Set by SIGINT/SIGTERM to wake the run loop and stop monitoring
+        self._stop_event = threading.Event()
     
     def save_event(self, event: ServiceEvent):
         """Save event to all configured databases"""
-        for db in self.databases:
+        futures = [self._io_pool.submit(db.save_event, event) for db in self.databases]
+        for future in futures:
             try:
-                db.save_event(event)
+                future.result()
             except Exception as e:
                 logging.error(f"Failed to save event to database: {e}")
     
-    def get_recent_failures(self, service_name: str) -> List[datetime]:
-        """Get recent failures for a service"""
-        cutoff_time = datetime.now() - timedelta(hours=self.config.get("alert_window_hours", 1))
+    def save_events_batch(self, events: List[ServiceEvent]):
+        """Save several events to all configured databases, one batch per database"""
+        if not events:
+            return
+        
+        futures = [self._io_pool.submit(db.save_events_batch, events) for db in self.databases]
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"Failed to save events to database: {e}")
+    
+    def expire_failures(self):
+        """Drop in-memory failures that have fallen out of the alert window"""
+        cutoff_time = time.time() - self.alert_window_seconds
+        for failures in self.service_failures.values():
+            while failures and failures[0] < cutoff_time:
+                failures.popleft()
+    
+    def reconcile_failures(self):
+        """Load failures recorded in the database that the in-memory window does not know about"""
+        if not self._have_db:
+            return
         
-        # Try to get from database first
-        for db in self.databases:
+        cutoff_time = time.time() - self.alert_window_seconds
+        for service_name in self.config.get("services", []):
             try:
-                failures = db.get_failures(service_name, cutoff_time)
-                if failures:
-                    return failures
+                stored = self._failure_db.get_failures(service_name, cutoff_time)
             except Exception as e:
                 logging.error(f"Failed to get failures from database: {e}")
-        
-        # Fallback to in-memory tracking
-        self.service_failures[service_name] = [
-            t for t in self.service_failures[service_name] if t >= cutoff_time
-        ]
-        return self.service_failures[service_name]
+                continue
+            
+            # The database is the durable copy, e.g. across restarts of the doctor itself
+            if len(stored) > len(self.service_failures[service_name]):
+                self.service_failures[service_name] = deque(sorted(stored))
     
     def record_failure(self, service_name: str):
         """Record a service failure"""
-        now = datetime.now()
-        
         # Save to databases
         event = ServiceEvent(
             service_name=service_name,
             event_type=EventType.FAILURE,
-            success=False,
-            timestamp=now
+            success=False
         )
         self.save_event(event)
         
-        # Also track in memory for fallback
-        self.service_failures[service_name].append(now)
-        
-        # Check if alert should be sent
-        recent_failures = self.get_recent_failures(service_name)
+        # The in-memory window decides on alerts, without a database round trip
+        recent_failures = self.service_failures[service_name]
+        recent_failures.append(event.timestamp)
         alert_threshold = self.config.get("alert_threshold", 3)
         
         if len(recent_failures) >= alert_threshold:
-            self.send_alerts(service_name, recent_failures)
+            if self.alert_batch_window_seconds > 0:
+                self.alert_batcher.add(service_name, list(recent_failures))
+            else:
+                self.send_alerts(service_name, list(recent_failures))
     
-    def send_alerts(self, service_name: str, failures: List[datetime]):
+    def send_alerts(self, service_name: str, failures: List[float]):
         """Send alerts through all configured channels"""
         logging.warning(f"Alert triggered for service {service_name} - {len(failures)} failures")
         
@@ -629,48 +1264,120 @@ class ServiceDoctor:
             except Exception as e:
                 logging.error(f"Failed to send {notif_config.notification_type.value} notification: {e}")
     
-    def scan_services(self):
-        """Scan all configured services"""
-        logging.info("Starting service scan...")
+    def flush_alerts(self):
+        """Send all alerts collected by the batcher, combined per channel"""
+        alerts = self.alert_batcher.drain()
+        if not alerts:
+            return
+        
+        if len(alerts) == 1:
+            service_name, failures = alerts[0]
+            self.send_alerts(service_name, failures)
+            return
+        
+        logging.warning(f"Alert triggered for services {', '.join(name for name, _ in alerts)}")
+        
+        for notif_config in self.notification_configs:
+            try:
+                sender = NotificationSenderFactory.create_sender(notif_config.notification_type)
+                sender.send_batch_notification(alerts, notif_config.config)
+            except Exception as e:
+                logging.error(f"Failed to send {notif_config.notification_type.value} notification: {e}")
+    
+    def _confirm_running(self, service: str) -> bool:
+        """Poll a restarted service with backoff until it reports active"""
+        deadline = time.monotonic() + self.service_manager.RESTART_TIMEOUT_SECONDS
+        delays = iter(self.RESTART_CONFIRM_DELAYS)
+        state = None
+        while True:
+            state = self.service_checker.get_service_state(service)
+            if state == "active":
+                return True
+            
+            delay = next(delays, None)
+            if delay is None:
+                # Slow units (databases, docker) may still be starting; wait for them up to the timeout
+                if state not in self.STARTING_STATES:
+                    break
+                delay = self.RESTART_CONFIRM_DELAYS[-1]
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            # Waiting on the stop event keeps shutdown responsive
+            if self._stop_event.wait(min(delay, remaining)):
+                break
+        
+        logging.warning(f"Service {service} did not become active after restart (state: {state})")
+        return False
+    
+    def _scan_one_service(self, service: str, is_running: bool) -> List[ServiceEvent]:
+        """Handle the checked state of one service and return the events to save"""
+        logging.debug(f"Checking service: {service}")
         
-        for service in self.config.get("services", []):
-            logging.debug(f"Checking service: {service}")
+        was_running = self._last_state.get(service)
+        self._last_state[service] = is_running
+        
+        if is_running:
+            logging.debug(f"Service {service} is running")
+            self._healthy_scans[service] += 1
             
-            if self.service_checker.is_service_running(service):
-                logging.debug(f"Service {service} is running")
-                # Save successful check event
-                event = ServiceEvent(
+            # Save successful check event on transitions and as a periodic heartbeat
+            if was_running is not True or self._healthy_scans[service] >= self.check_heartbeat_scans:
+                self._healthy_scans[service] = 0
+                return [ServiceEvent(
                     service_name=service,
                     event_type=EventType.CHECK,
-                    success=True,
-                    timestamp=datetime.now()
-                )
-                self.save_event(event)
-            else:
-                logging.warning(f"Service {service} is down, attempting to restart")
-                
-                restart_success = self.service_manager.restart_service(service)
-                
-                # Save restart event
-                restart_event = ServiceEvent(
-                    service_name=service,
-                    event_type=EventType.RESTART,
-                    success=restart_success,
-                    timestamp=datetime.now()
-                )
-                self.save_event(restart_event)
-                
-                if restart_success:
-                    logging.info(f"Service {service} restarted successfully")
-                else:
-                    logging.error(f"Failed to restart service {service}")
-                    self.record_failure(service)
+                    success=True
+                )]
+            return []
+        
+        self._healthy_scans[service] = 0
+        logging.warning(f"Service {service} is down, attempting to restart")
+        
+        restart_success = self.service_manager.restart_service(service) and self._confirm_running(service)
+        
+        if restart_success:
+            logging.info(f"Service {service} restarted successfully")
+        else:
+            logging.error(f"Failed to restart service {service}")
+            self.record_failure(service)
+        
+        # Save restart event
+        return [ServiceEvent(
+            service_name=service,
+            event_type=EventType.RESTART,
+            success=restart_success
+        )]
+    
+    def scan_services(self):
+        """Scan all configured services"""
+        logging.info("Starting service scan...")
+        
+        self.expire_failures()
+        
+        # States come from one batched check; services are then handled in parallel so a
+        # slow restart does not hold up the others
+        service_states = self.service_checker.are_services_running(self.config.get("services", []))
+        futures = {
+            self._scan_pool.submit(self._scan_one_service, service, is_running): service
+            for service, is_running in service_states.items()
+        }
+        
+        # Check and restart events are collected and written once at the end of the scan
+        scan_events = []
+        for future, service in futures.items():
+            try:
+                scan_events.extend(future.result())
+            except Exception as e:
+                logging.error(f"Error while scanning service {service}: {e}")
+        self.save_events_batch(scan_events)
         
         logging.info("Service scan completed")
     
     def cleanup_old_data(self):
         """Clean up old data from databases"""
-        cutoff_time = datetime.now() - timedelta(hours=self.config.get("retention_hours", 24))
+        cutoff_time = time.time() - self.config.get("retention_hours", 24) * 3600
         
         for db in self.databases:
             try:
@@ -678,39 +1385,75 @@ class ServiceDoctor:
             except Exception as e:
                 logging.error(f"Failed to cleanup old data: {e}")
     
+    def close(self):
+        """Send pending alerts, then flush and close all database connections"""
+        self.flush_alerts()
+        self._scan_pool.shutdown(wait=True)
+        self._io_pool.shutdown(wait=True)
+        for db in self.databases:
+            try:
+                db.close()
+            except Exception as e:
+                logging.error(f"Failed to close database: {e}")
+        self.service_checker.close()
+        self.service_manager.close()
+    
+    def stop(self, signum=None, frame=None):
+        """Ask the run loop to exit; usable as a signal handler"""
+        if signum is not None:
+            logging.info(f"Received signal {signal.Signals(signum).name}, stopping service monitoring")
+        self._stop_event.set()
+    
     def run(self):
         """Main run loop"""
         logging.info("Linux Service Doctor starting...")
         
-        services = self.config.get("services", [])
-        if not services:
-            logging.warning("No services configured for monitoring.")
-            return
-        
-        logging.info(f"Monitoring services: {', '.join(services)}")
-        logging.info(f"Scan interval: {self.config.get('scan_interval_minutes', 5)} minutes")
-        
-        # Run initial scan
-        self.scan_services()
-        
-        # Schedule regular scans
-        scan_interval = self.config.get("scan_interval_minutes", 5)
-        schedule.every(scan_interval).minutes.do(self.scan_services)
-        
-        # Schedule cleanup
-        schedule.every(1).hours.do(self.cleanup_old_data)
-        
-        logging.info("Service monitoring is active")
-        
+        # Install the handlers before touching the databases so a stop signal during startup
+        # still goes through close() and shuts the background writers down
+        signal.signal(signal.SIGINT, self.stop)
+        signal.signal(signal.SIGTERM, self.stop)
         try:
-            while True:
+            services = self.config.get("services", [])
+            if not services:
+                logging.warning("No services configured for monitoring.")
+                return
+            
+            logging.info(f"Monitoring services: {', '.join(services)}")
+            logging.info(f"Scan interval: {self.config.get('scan_interval_minutes', 5)} minutes")
+            
+            # Pick up failures recorded before this process started, then run initial scan
+            self.reconcile_failures()
+            self.scan_services()
+            
+            # Schedule regular scans
+            scan_interval = self.config.get("scan_interval_minutes", 5)
+            schedule.every(scan_interval).minutes.do(self.scan_services)
+            
+            # Schedule cleanup and reconciliation of the in-memory failure window
+            schedule.every(1).hours.do(self.cleanup_old_data)
+            schedule.every(1).hours.do(self.reconcile_failures)
+            
+            # Schedule batched alert delivery
+            if self.alert_batch_window_seconds > 0:
+                schedule.every(self.alert_batch_window_seconds).seconds.do(self.flush_alerts)
+            
+            logging.info("Service monitoring is active")
+            
+            while not self._stop_event.is_set():
                 schedule.run_pending()
-                time.sleep(1)
+                # Sleep until the next job is due, capped so schedule changes are picked up
+                idle_seconds = schedule.idle_seconds()
+                if idle_seconds is None:
+                    idle_seconds = 60
+                self._stop_event.wait(timeout=max(0, min(idle_seconds, 60)))
+            logging.info("Service monitoring stopped")
         except KeyboardInterrupt:
             logging.info("Service monitoring stopped by user")
         except Exception as e:
             logging.error(f"Unexpected error: {e}")
             return 1
+        finally:
+            self.close()
         
         return 0
 